@@ -0,0 +1,24 @@
+"""
+Gunicorn configuration for SpottyHue.
+Usage: gunicorn -c gunicorn.conf.py
+"""
+
+import os
+
+wsgi_app = "web_app:create_app()"
+bind = f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', '5001')}"
+
+# A single worker process: the sync loop and its state live in-process, so
+# extra workers would each run their own SyncManager and disagree about status.
+# Concurrency comes from threads instead (handlers mostly wait on Spotify/Hue I/O).
+workers = 1
+worker_class = "gthread"
+# Each open /api/events stream holds a thread for as long as the page is open
+threads = 16
+timeout = 120
+
+# Import the app before forking
+preload_app = True
+
+# Keep the worker heartbeat file in RAM rather than on the container's overlay filesystem
+worker_tmp_dir = "/dev/shm"
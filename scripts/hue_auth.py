@@ -12,6 +12,9 @@ from pathlib import Path
 BRIDGE_IP = "192.168.0.245"
 CONFIG_FILE = Path(__file__).parent / ".hue_config"
 
+# Shared session so repeated bridge calls (e.g. while waiting for the link button) reuse one connection
+_session = requests.Session()
+
 
 def discover_bridge():
     """Discover Hue bridge on the network."""
@@ -32,10 +35,23 @@ def discover_bridge():
         return None
 
 
+def bridge_request(method, bridge_ip, path, **kwargs):
+    """
+    Send a request to the bridge over plain HTTP, falling back to HTTPS.
+
+    The bridge serves the API on port 80 on the LAN, which avoids the TLS
+    handshake; HTTPS (with its self-signed certificate) is kept as a safety net.
+    """
+    try:
+        return _session.request(method, f"http://{bridge_ip}{path}", timeout=5, **kwargs)
+    except requests.ConnectionError:
+        return _session.request(method, f"https://{bridge_ip}{path}", verify=False, timeout=5, **kwargs)
+
+
 def get_bridge_info(bridge_ip):
     """Get bridge configuration and info."""
     try:
-        response = requests.get(f"https://{bridge_ip}/api/config", verify=False, timeout=5)
+        response = bridge_request("GET", bridge_ip, "/api/config")
         config = response.json()
         print(f"\nBridge Info:")
         print(f"  Name: {config.get('name')}")
@@ -55,33 +71,32 @@ def create_user(bridge_ip, app_name="spottyhue#dev"):
     print("\nPlease press the LINK BUTTON on your Hue Bridge now.")
     print("You have 30 seconds...\n")
 
-    for i in range(30, 0, -1):
-        print(f"Waiting... {i}s ", end='\r')
-        time.sleep(1)
-
-        if i % 2 == 0:  # Try every 2 seconds
-            try:
-                payload = {"devicetype": app_name}
-                response = requests.post(
-                    f"https://{bridge_ip}/api",
-                    json=payload,
-                    verify=False,
-                    timeout=5
-                )
-                result = response.json()[0]
-
-                if "success" in result:
-                    username = result["success"]["username"]
-                    print(f"\n\n✓ Authentication successful!           ")
-                    print(f"  Username: {username}")
-                    return username
-                elif "error" in result:
-                    error_type = result["error"].get("type")
-                    if error_type != 101:  # 101 is "link button not pressed"
-                        print(f"\n✗ Error: {result['error'].get('description')}")
-                        return None
-            except Exception as e:
-                continue
+    payload = {"devicetype": app_name}
+    deadline = time.monotonic() + 30
+
+    while (remaining := deadline - time.monotonic()) > 0:
+        print(f"Waiting... {int(remaining) + 1}s ", end='\r')
+
+        try:
+            response = bridge_request("POST", bridge_ip, "/api", json=payload)
+            result = response.json()[0]
+        except Exception:
+            # Bridge unreachable or garbled reply - back off a little before retrying
+            time.sleep(1)
+            continue
+
+        if "success" in result:
+            username = result["success"]["username"]
+            print(f"\n\n✓ Authentication successful!           ")
+            print(f"  Username: {username}")
+            return username
+        elif "error" in result:
+            error_type = result["error"].get("type")
+            if error_type != 101:  # 101 is "link button not pressed"
+                print(f"\n✗ Error: {result['error'].get('description')}")
+                return None
+
+        time.sleep(0.5)
 
     print("\n\n✗ Timeout - Bridge button was not pressed in time")
     return None
@@ -120,11 +135,7 @@ def test_connection(bridge_ip, username):
     """Test the API connection by getting lights."""
     print("\nTesting connection...")
     try:
-        response = requests.get(
-            f"https://{bridge_ip}/api/{username}/lights",
-            verify=False,
-            timeout=5
-        )
+        response = bridge_request("GET", bridge_ip, f"/api/{username}/lights")
         lights = response.json()
 
         if isinstance(lights, dict) and not any("error" in str(v) for v in lights.values()):
@@ -189,7 +200,7 @@ def main():
 
 
 if __name__ == "__main__":
-    # Disable SSL warnings since Hue bridge uses self-signed cert
+    # Disable SSL warnings in case we fall back to the bridge's self-signed HTTPS cert
     import urllib3
     urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
@@ -7,6 +7,7 @@ Sync Spotify album artwork colors to Philips Hue lights.
 import os
 import sys
 from dotenv import load_dotenv
+from src import dns_cache
 from src.spotify_client import SpotifyClient
 from src.hue_controller import HueController
 from src.spottyhue import SpottyHue
@@ -55,6 +56,9 @@ def main():
     print("Loading configuration...")
     config = load_config()
 
+    # Cache name lookups before any client starts polling
+    dns_cache.install()
+
     print("Initializing Spotify client...")
     spotify = SpotifyClient(
         client_id=config['spotify_client_id'],
@@ -3,18 +3,66 @@ Color Extractor
 Extracts dominant colors from album artwork images.
 """
 
-import os
+import colorsys
+import functools
+import logging
 import requests
 from io import BytesIO
 from PIL import Image
 from colorthief import ColorThief
+from requests.adapters import HTTPAdapter
 from typing import List, Tuple
-import tempfile
+from urllib3.util.retry import Retry
+
+from . import __version__
+
+# Shared session so artwork downloads reuse connections to the image CDN
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(
+    pool_connections=2,
+    pool_maxsize=4,
+    max_retries=Retry(total=2, backoff_factor=0.2)
+))
+# Album art is already-compressed JPEG, so don't spend CPU on gzip
+_session.headers.update({
+    "Accept-Encoding": "identity",
+    "User-Agent": f"spottyhue/{__version__}"
+})
+
+logger = logging.getLogger(__name__)
+
+
+@functools.lru_cache(maxsize=128)
+def _cached_palette(image_url: str, num_colors: int) -> Tuple[Tuple[int, int, int], ...]:
+    """Download artwork and extract its palette; results are memoized per (url, num_colors)."""
+    color_thief = ColorThief(ColorExtractor._fetch_image(image_url))
+
+    if num_colors == 1:
+        # Get single dominant color
+        return (color_thief.get_color(quality=1),)
+
+    # Get color palette
+    return tuple(color_thief.get_palette(color_count=num_colors, quality=1))
 
 
 class ColorExtractor:
     """Extract dominant colors from images."""
 
+    @staticmethod
+    def _fetch_image(image_url: str) -> BytesIO:
+        """
+        Download an image into memory.
+
+        Args:
+            image_url: URL of the image
+
+        Returns:
+            In-memory file with the encoded image
+        """
+        response = _session.get(image_url, timeout=10)
+        response.raise_for_status()
+        return BytesIO(response.content)
+
     @staticmethod
     def extract_colors_from_url(image_url: str, num_colors: int = 3) -> List[Tuple[int, int, int]]:
         """
@@ -27,39 +75,15 @@ class ColorExtractor:
         Returns:
             List of RGB tuples
         """
-        tmp_path = None
         try:
-            # Download image
-            response = requests.get(image_url, timeout=10)
-            response.raise_for_status()
-
-            # Save to temporary file (ColorThief requires a file path)
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.jpg') as tmp_file:
-                tmp_file.write(response.content)
-                tmp_path = tmp_file.name
-
-            # Extract colors
-            color_thief = ColorThief(tmp_path)
-
-            if num_colors == 1:
-                # Get single dominant color
-                color = color_thief.get_color(quality=1)
-                return [color]
-            else:
-                # Get color palette
-                palette = color_thief.get_palette(color_count=num_colors, quality=1)
-                return palette
+            palette = _cached_palette(image_url, num_colors)
+            logger.debug("Palette cache: %s", _cached_palette.cache_info())
+            return list(palette)
 
         except Exception as e:
             print(f"Error extracting colors: {e}")
             # Return default colors if extraction fails
             return [(255, 0, 0), (0, 255, 0), (0, 0, 255)][:num_colors]
-        finally:
-            if tmp_path:
-                try:
-                    os.unlink(tmp_path)
-                except OSError:
-                    pass
 
     @staticmethod
     def extract_colors_advanced(image_url: str, num_colors: int = 3) -> List[Tuple[int, int, int]]:
@@ -75,33 +99,18 @@ class ColorExtractor:
             List of RGB tuples
         """
         try:
-            # Download image
-            response = requests.get(image_url, timeout=10)
-            response.raise_for_status()
+            img = Image.open(ColorExtractor._fetch_image(image_url))
 
-            # Load image
-            img = Image.open(BytesIO(response.content))
+            # Shrink the image; 64x64 is plenty to find a handful of clusters
+            img = img.convert('RGB').resize((64, 64), Image.Resampling.BILINEAR)
 
-            # Resize for faster processing
-            img = img.resize((150, 150))
-
-            # Convert to RGB if needed
-            if img.mode != 'RGB':
-                img = img.convert('RGB')
-
-            # Get colors using quantize
-            img_quantized = img.quantize(colors=num_colors)
+            # Fast octree quantization refined with Pillow's built-in k-means pass
+            img_quantized = img.quantize(colors=num_colors, method=Image.Quantize.FASTOCTREE, kmeans=1)
             palette = img_quantized.getpalette()
 
-            # Extract RGB values
-            colors = []
-            for i in range(num_colors):
-                r = palette[i * 3]
-                g = palette[i * 3 + 1]
-                b = palette[i * 3 + 2]
-                colors.append((r, g, b))
-
-            return colors
+            # Order clusters by how many pixels they cover, most dominant first
+            counts = sorted(img_quantized.getcolors(num_colors) or [], reverse=True)
+            return [tuple(palette[i * 3:i * 3 + 3]) for _, i in counts]
 
         except Exception as e:
             print(f"Error in advanced extraction: {e}")
@@ -122,12 +131,8 @@ class ColorExtractor:
         Returns:
             Filtered list of colors
         """
-        filtered = []
-        for r, g, b in colors:
-            # Calculate brightness
-            brightness = (r + g + b) / 3
-            if min_brightness <= brightness <= max_brightness:
-                filtered.append((r, g, b))
+        low, high = min_brightness * 3, max_brightness * 3
+        filtered = [rgb for rgb in colors if low <= sum(rgb) <= high]
 
         # If all colors filtered out, return original
         return filtered if filtered else colors
@@ -145,48 +150,10 @@ class ColorExtractor:
             Boosted RGB tuple
         """
         r, g, b = rgb
-
-        # Convert to HSV
-        r_norm, g_norm, b_norm = r / 255.0, g / 255.0, b / 255.0
-        max_val = max(r_norm, g_norm, b_norm)
-        min_val = min(r_norm, g_norm, b_norm)
-        diff = max_val - min_val
-
-        # Calculate saturation
-        s = 0 if max_val == 0 else diff / max_val
+        h, s, v = colorsys.rgb_to_hsv(r / 255.0, g / 255.0, b / 255.0)
 
         # Boost saturation
         s = min(1.0, s * factor)
 
-        # Convert back to RGB
-        if diff == 0:
-            return rgb  # Gray color, no change
-
-        if max_val == r_norm:
-            h = ((g_norm - b_norm) / diff) % 6
-        elif max_val == g_norm:
-            h = ((b_norm - r_norm) / diff) + 2
-        else:
-            h = ((r_norm - g_norm) / diff) + 4
-
-        h = h / 6.0
-
-        # HSV to RGB
-        def hue_to_rgb(p, q, t):
-            if t < 0: t += 1
-            if t > 1: t -= 1
-            if t < 1/6: return p + (q - p) * 6 * t
-            if t < 1/2: return q
-            if t < 2/3: return p + (q - p) * (2/3 - t) * 6
-            return p
-
-        if s == 0:
-            r = g = b = max_val
-        else:
-            q = max_val * (1 + s) if max_val < 0.5 else max_val + s - max_val * s
-            p = 2 * max_val - q
-            r = hue_to_rgb(p, q, h + 1/3)
-            g = hue_to_rgb(p, q, h)
-            b = hue_to_rgb(p, q, h - 1/3)
-
-        return (int(r * 255), int(g * 255), int(b * 255))
+        r, g, b = colorsys.hsv_to_rgb(h, s, v)
+        return (round(r * 255), round(g * 255), round(b * 255))
@@ -0,0 +1,58 @@
+"""
+DNS Cache
+Process-wide TTL cache in front of socket.getaddrinfo.
+"""
+
+import socket
+import threading
+import time
+from typing import Dict, List, Tuple
+
+DEFAULT_TTL = 300  # seconds
+MAX_ENTRIES = 64
+
+_original_getaddrinfo = socket.getaddrinfo
+_cache: Dict[tuple, Tuple[float, List[tuple]]] = {}
+_lock = threading.Lock()
+_ttl = DEFAULT_TTL
+
+
+def _cached_getaddrinfo(*args, **kwargs) -> List[tuple]:
+    """Drop-in replacement for socket.getaddrinfo that reuses recent answers."""
+    key = args + tuple(sorted(kwargs.items()))
+    now = time.monotonic()
+
+    with _lock:
+        entry = _cache.get(key)
+    if entry is not None and entry[0] > now:
+        return list(entry[1])
+
+    # Miss or expired - resolve for real (failures propagate and are not cached)
+    result = _original_getaddrinfo(*args, **kwargs)
+
+    with _lock:
+        if key not in _cache and len(_cache) >= MAX_ENTRIES:
+            # Evict the oldest entry
+            _cache.pop(next(iter(_cache)))
+        _cache[key] = (now + _ttl, result)
+    return list(result)
+
+
+def install(ttl: int = DEFAULT_TTL):
+    """
+    Route all name lookups in this process through the cache.
+
+    Safe to call more than once.
+
+    Args:
+        ttl: How long to reuse a resolved address (seconds)
+    """
+    global _ttl
+    _ttl = ttl
+    socket.getaddrinfo = _cached_getaddrinfo
+
+
+def clear():
+    """Forget all cached lookups."""
+    with _lock:
+        _cache.clear()
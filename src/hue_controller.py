@@ -5,11 +5,33 @@ Handles communication with Hue Bridge and color conversions.
 
 import requests
 import json
-from typing import List, Tuple, Optional
-import urllib3
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterable, List, Sequence, Tuple, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-# Disable SSL warnings for self-signed Hue bridge certificate
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+# Wide RGB D65 -> XYZ conversion matrix (rows are X, Y, Z)
+_RGB_TO_XYZ = (
+    (0.664511, 0.154324, 0.162028),
+    (0.283881, 0.668433, 0.047685),
+    (0.000088, 0.072310, 0.986039),
+)
+
+# Gamma-corrected linear value for every 8-bit channel level
+_LINEAR = tuple(
+    ((v / 255.0 + 0.055) / 1.055) ** 2.4 if v / 255.0 > 0.04045 else v / 255.0 / 12.92
+    for v in range(256)
+)
+
+
+def _linear(channel) -> float:
+    """Look up a channel's linear value, rounding floats and clamping to 0-255 first."""
+    return _LINEAR[min(max(round(channel), 0), 255)]
+
+# How long a sent state is trusted before it's re-sent anyway; lights can be changed
+# from the Hue app or a switch without us knowing
+LAST_STATE_TTL = 60.0  # seconds
 
 
 class HueController:
@@ -25,22 +47,53 @@ class HueController:
         """
         self.bridge_ip = bridge_ip
         self.username = username
-        self.base_url = f"https://{bridge_ip}/api/{username}"
+        # Plain HTTP: the bridge's certificate is self-signed, so TLS only cost a handshake
+        self.base_url = f"http://{bridge_ip}/api/{username}"
+        self._lights_url = f"{self.base_url}/lights"
+        self._groups_url = f"{self.base_url}/groups"
+        self._light_fmt = f"{self._lights_url}/%s"
+        self._light_state_fmt = f"{self._lights_url}/%s/state"
+
+        # Persistent session so every call reuses the connection to the bridge
+        self._session = requests.Session()
+        self._session.mount("http://", HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=8,
+            max_retries=Retry(total=2, backoff_factor=0.1)
+        ))
+
+        # Worker pool for concurrent PUTs; kept <= pool_maxsize so no thread waits on a connection
+        self._pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="hue")
+
+        # Last state the bridge accepted for each light: (x, y, bri, expiry)
+        self._last_state: Dict[int, Tuple[float, float, int, float]] = {}
+
+        # Reusable per-light "set color" payloads, updated in place on each call
+        self._state_cache: Dict[int, dict] = {}
 
     def get_lights(self) -> dict:
-        """Get all lights from the bridge."""
-        response = requests.get(f"{self.base_url}/lights", verify=False, timeout=5)
-        return response.json()
+        """Get all lights from the bridge, keyed by integer light ID."""
+        response = self._session.get(self._lights_url, timeout=5)
+        lights = response.json()
+        # Errors come back as a list; pass those through untouched
+        if not isinstance(lights, dict):
+            return lights
+        return {int(light_id): light for light_id, light in lights.items()}
 
     def get_light(self, light_id: int) -> dict:
         """Get specific light info."""
-        response = requests.get(f"{self.base_url}/lights/{light_id}", verify=False, timeout=5)
+        response = self._session.get(self._light_fmt % light_id, timeout=5)
         return response.json()
 
     def get_groups(self) -> dict:
-        """Get all groups (rooms/zones) from the bridge."""
-        response = requests.get(f"{self.base_url}/groups", verify=False, timeout=5)
-        return response.json()
+        """Get all groups (rooms/zones) from the bridge, with integer group and light IDs."""
+        response = self._session.get(self._groups_url, timeout=5)
+        groups = response.json()
+        if not isinstance(groups, dict):
+            return groups
+        for group in groups.values():
+            group['lights'] = [int(light_id) for light_id in group.get('lights', [])]
+        return {int(group_id): group for group_id, group in groups.items()}
 
     def set_color(self, light_id: int, rgb: Tuple[int, int, int], brightness: int = 254, transition_time: int = 10):
         """
@@ -55,20 +108,11 @@ class HueController:
         # Convert RGB to XY color space
         xy = self.rgb_to_xy(rgb)
 
-        state = {
-            "on": True,
-            "xy": xy,
-            "bri": brightness,
-            "transitiontime": transition_time
-        }
-
-        response = requests.put(
-            f"{self.base_url}/lights/{light_id}/state",
-            json=state,
-            verify=False,
-            timeout=5
-        )
-        return response.json()
+        if self._is_unchanged(light_id, xy, brightness):
+            return {"success": "noop"}
+
+        state = self._color_state(light_id, xy, brightness, transition_time)
+        return self._put_state(light_id, state)
 
     def set_multiple_colors(self, light_colors: dict, brightness: int = 254, transition_time: int = 10):
         """
@@ -79,21 +123,85 @@ class HueController:
             brightness: Brightness (0-254)
             transition_time: Transition time in deciseconds
         """
+        return self.set_colors_batch(list(light_colors), list(light_colors.values()), brightness, transition_time)
+
+    def set_colors_batch(self, light_ids: Sequence[int], rgbs: Sequence[Tuple[int, int, int]],
+                         brightness: int = 254, transition_time: int = 10):
+        """
+        Set lights to colors given as parallel sequences.
+
+        Args:
+            light_ids: Light IDs to control
+            rgbs: (r, g, b) tuple for each light, in the same order as light_ids
+            brightness: Brightness (0-254)
+            transition_time: Transition time in deciseconds
+
+        Returns:
+            Dict of {light_id: bridge response}
+        """
+        xys = self.rgb_to_xy_batch(rgbs)
+
         results = {}
-        for light_id, rgb in light_colors.items():
-            results[light_id] = self.set_color(light_id, rgb, brightness, transition_time)
+        futures = {}
+        for light_id, xy in zip(light_ids, xys):
+            if self._is_unchanged(light_id, xy, brightness):
+                results[light_id] = {"success": "noop"}
+                continue
+
+            state = self._color_state(light_id, xy, brightness, transition_time)
+            futures[self._pool.submit(self._put_state, light_id, state)] = light_id
+
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
         return results
 
     def turn_off(self, light_id: int):
         """Turn off a light."""
-        state = {"on": False}
-        response = requests.put(
-            f"{self.base_url}/lights/{light_id}/state",
-            json=state,
-            verify=False,
-            timeout=5
+        return self._put_state(light_id, {"on": False})
+
+    def _color_state(self, light_id: int, xy: List[float], brightness: int, transition_time: int) -> dict:
+        """Fill in the cached state payload for a light instead of allocating a new one."""
+        state = self._state_cache.get(light_id)
+        if state is None:
+            state = self._state_cache[light_id] = {"on": True}
+        state["xy"] = xy
+        state["bri"] = brightness
+        state["transitiontime"] = transition_time
+        return state
+
+    def _is_unchanged(self, light_id: int, xy: List[float], brightness: int) -> bool:
+        """Check whether a light is already on with this color and brightness."""
+        last = self._last_state.get(light_id)
+        if last is None:
+            return False
+        x, y, bri, expiry = last
+        return (bri == brightness and abs(xy[0] - x) + abs(xy[1] - y) < 1e-4
+                and time.monotonic() < expiry)
+
+    def forget_state(self):
+        """Forget what was last sent, so the next update is sent to every light."""
+        self._last_state.clear()
+
+    def _put_state(self, light_id: int, state: dict):
+        """Send a state update to a light and remember it if the bridge accepted it."""
+        try:
+            response = self._session.put(self._light_state_fmt % light_id, json=state, timeout=5)
+        except requests.RequestException:
+            # Bridge state is unknown now, so force a full re-sync on the next update
+            self._last_state.clear()
+            raise
+
+        result = response.json()
+        # The v1 API reports failures as 200 with [{"error": ...}] entries
+        accepted = response.ok and not (
+            isinstance(result, list) and any("error" in entry for entry in result)
         )
-        return response.json()
+        if accepted and state.get("on"):
+            x, y = state["xy"]
+            self._last_state[light_id] = (x, y, state["bri"], time.monotonic() + LAST_STATE_TTL)
+        else:
+            self._last_state.pop(light_id, None)
+        return result
 
     @staticmethod
     def rgb_to_xy(rgb: Tuple[int, int, int]) -> List[float]:
@@ -107,32 +215,39 @@ class HueController:
         Returns:
             List of [x, y] coordinates
         """
-        # Normalize RGB values to 0-1
-        r, g, b = [x / 255.0 for x in rgb]
+        return HueController.rgb_to_xy_batch([rgb])[0]
 
-        # Apply gamma correction
-        r = ((r + 0.055) / 1.055) ** 2.4 if r > 0.04045 else r / 12.92
-        g = ((g + 0.055) / 1.055) ** 2.4 if g > 0.04045 else g / 12.92
-        b = ((b + 0.055) / 1.055) ** 2.4 if b > 0.04045 else b / 12.92
+    @staticmethod
+    def rgb_to_xy_batch(rgbs: Iterable[Tuple[int, int, int]]) -> List[List[float]]:
+        """
+        Convert several RGB colors to XY in a single pass.
 
-        # Convert to XYZ using Wide RGB D65 conversion
-        X = r * 0.664511 + g * 0.154324 + b * 0.162028
-        Y = r * 0.283881 + g * 0.668433 + b * 0.047685
-        Z = r * 0.000088 + g * 0.072310 + b * 0.986039
+        Args:
+            rgbs: Iterable of (r, g, b) tuples (0-255; floats are rounded, out-of-range values clamped)
 
-        # Calculate xy coordinates
-        total = X + Y + Z
-        if total == 0:
-            return [0.0, 0.0]
+        Returns:
+            List of [x, y] coordinates, in input order
+        """
+        (xr, xg, xb), (yr, yg, yb), (zr, zg, zb) = _RGB_TO_XYZ
+        results = []
+        for rgb in rgbs:
+            # Normalize to 0-1 and apply gamma correction
+            r, g, b = _linear(rgb[0]), _linear(rgb[1]), _linear(rgb[2])
 
-        x = X / total
-        y = Y / total
+            X = r * xr + g * xg + b * xb
+            Y = r * yr + g * yg + b * yb
+            Z = r * zr + g * zg + b * zb
+            total = X + Y + Z
+            if total == 0:
+                results.append([0.0, 0.0])
+                continue
 
-        # Clamp to valid range
-        x = max(0.0, min(1.0, x))
-        y = max(0.0, min(1.0, y))
+            # Clamp to valid range
+            x = max(0.0, min(1.0, X / total))
+            y = max(0.0, min(1.0, Y / total))
+            results.append([round(x, 4), round(y, 4)])
 
-        return [round(x, 4), round(y, 4)]
+        return results
 
     def test_connection(self) -> bool:
         """Test if connection to bridge is working."""
@@ -142,3 +257,8 @@ class HueController:
         except Exception as e:
             print(f"Connection test failed: {e}")
             return False
+
+    def close(self):
+        """Release pooled bridge connections and worker threads."""
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._session.close()
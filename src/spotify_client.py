@@ -3,8 +3,11 @@ Spotify Client
 Handles Spotify API authentication and playback monitoring.
 """
 
+import requests
 import spotipy
+from requests.adapters import HTTPAdapter
 from spotipy.oauth2 import SpotifyOAuth
+from urllib3.util.retry import Retry
 from typing import Optional, Dict
 
 
@@ -27,18 +30,39 @@ class SpotifyClient:
         # Set up OAuth with required scopes
         scope = "user-read-currently-playing user-read-playback-state"
 
-        self.sp = spotipy.Spotify(auth_manager=SpotifyOAuth(
-            client_id=client_id,
-            client_secret=client_secret,
-            redirect_uri=redirect_uri,
-            scope=scope,
-            cache_path=".spotify_cache"
+        # One keep-alive session shared by API calls and token refreshes
+        self._session = requests.Session()
+        self._session.mount("https://", HTTPAdapter(
+            pool_connections=2,
+            pool_maxsize=4,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.3,
+                status_forcelist=[429, 500, 502, 503, 504],
+                allowed_methods=frozenset(['GET', 'POST'])
+            )
         ))
 
-    def get_current_track(self) -> Optional[Dict]:
+        self.sp = spotipy.Spotify(
+            auth_manager=SpotifyOAuth(
+                client_id=client_id,
+                client_secret=client_secret,
+                redirect_uri=redirect_uri,
+                scope=scope,
+                cache_path=".spotify_cache",
+                requests_session=self._session
+            ),
+            requests_session=self._session
+        )
+
+    def get_current_track(self, raise_errors: bool = False) -> Optional[Dict]:
         """
         Get currently playing track information.
 
+        Args:
+            raise_errors: Re-raise request failures (timeouts, rate limits) instead of
+                          reporting them as nothing playing
+
         Returns:
             Dict with track info or None if nothing playing
         """
@@ -67,6 +91,8 @@ class SpotifyClient:
             return track_info
 
         except Exception as e:
+            if raise_errors:
+                raise
             print(f"Error getting current track: {e}")
             return None
 
@@ -114,3 +140,7 @@ class SpotifyClient:
         except Exception as e:
             print(f"Spotify connection test failed: {e}")
             return False
+
+    def close(self):
+        """Release pooled connections to the Spotify API."""
+        self._session.close()
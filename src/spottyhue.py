@@ -50,6 +50,18 @@ class SpottyHue:
         self.current_colors: List[Tuple[int, int, int]] = []
         self.light_colors: Dict[int, Tuple[int, int, int]] = {}
 
+    def update_config(self, config: dict):
+        """
+        Apply new settings; safe to call repeatedly with the same config.
+
+        Args:
+            config: Dict with light_ids, num_colors, update_interval and brightness
+        """
+        self.light_ids = config['light_ids']
+        self.num_colors = min(config['num_colors'], len(self.light_ids))
+        self.update_interval = config['update_interval']
+        self.brightness = config['brightness']
+
     def get_colors_for_track(self, track_info: dict) -> List[Tuple[int, int, int]]:
         """
         Extract and process colors from the track's album artwork.
@@ -65,23 +77,23 @@ class SpottyHue:
             logger.warning("No album artwork available")
             return []
 
-        logger.info(f"Extracting {self.num_colors} colors from artwork: {track_info['album']}")
+        logger.info("Extracting %d colors from artwork: %s", self.num_colors, track_info['album'])
         
         # Extract extra colors to allow for filtering
         colors = self.color_extractor.extract_colors_from_url(album_art_url, self.num_colors + 3)
 
-        # Filter out near-black colors (Hue can't display black)
-        filtered_colors = [rgb for rgb in colors if sum(rgb) > 120]
+        # Drop near-black colors (Hue can't display black), then washed-out ones
+        visible_colors = [rgb for rgb in colors if sum(rgb) > 120]
+        filtered_colors = [rgb for rgb in visible_colors if sum(rgb) <= 690]
 
-        # If we filtered out too many, use original colors
+        # If we filtered out too many, give back the washed-out colors before the dark ones
+        if len(filtered_colors) < self.num_colors:
+            filtered_colors = visible_colors
         if len(filtered_colors) < self.num_colors:
             filtered_colors = colors
 
         # Take the top N colors
-        final_colors = filtered_colors[:self.num_colors]
-        
-        # Filter and boost colors for better visuals
-        return self.color_extractor.filter_colors(final_colors)
+        return filtered_colors[:self.num_colors]
 
     def sync_colors_to_lights(self, track_info: dict):
         """
@@ -90,7 +102,7 @@ class SpottyHue:
         Args:
             track_info: Track information dict from Spotify
         """
-        logger.info(f"Now Playing: {track_info['name']} - {track_info['artist']}")
+        logger.info("Now Playing: %s - %s", track_info['name'], track_info['artist'])
 
         # Get processed colors
         self.current_colors = self.get_colors_for_track(track_info)
@@ -98,19 +110,40 @@ class SpottyHue:
         if not self.current_colors:
             return
 
-        # Map colors to lights
-        self.light_colors = {}
-        for i, light_id in enumerate(self.light_ids[:self.num_colors]):
-            color_idx = i % len(self.current_colors)
-            rgb = self.current_colors[color_idx]
-            self.light_colors[light_id] = rgb
-            logger.debug(f"Light {light_id}: RGB{rgb}")
+        # Map colors to lights as parallel lists
+        light_ids = self.light_ids[:self.num_colors]
+        rgbs = [self.current_colors[i % len(self.current_colors)] for i in range(len(light_ids))]
+        # Rebuilt and swapped in whole so readers on other threads never see a partial map
+        self.light_colors = dict(zip(light_ids, rgbs))
+        if logger.isEnabledFor(logging.DEBUG):
+            for light_id, rgb in self.light_colors.items():
+                logger.debug("Light %d: RGB%s", light_id, rgb)
 
         # Apply colors to lights
         logger.info("Updating lights...")
-        self.hue.set_multiple_colors(self.light_colors, brightness=self.brightness, transition_time=10)
+        self.hue.set_colors_batch(light_ids, rgbs, brightness=self.brightness, transition_time=10)
         logger.info("Lights updated!")
 
+    def _next_poll_delay(self, track: Optional[dict]) -> float:
+        """
+        Work out how long to wait before polling Spotify again.
+
+        Mid-song we back off to a few update intervals, then tighten up
+        as the track approaches its end so the change is picked up quickly.
+
+        Args:
+            track: Track information dict from Spotify, or None if nothing is playing
+
+        Returns:
+            Delay in seconds
+        """
+        if track is None:
+            # Paused or idle - nothing will change until playback resumes
+            return max(self.update_interval, 10.0)
+
+        remaining = (track.get('duration_ms', 0) - track.get('progress_ms', 0)) / 1000
+        return max(1.0, min(self.update_interval * 4, remaining - 1.0))
+
     def run(self):
         """Main run loop - monitor Spotify and update lights."""
         logger.info("Starting SpottyHue...")
@@ -127,11 +160,13 @@ class SpottyHue:
             return
 
         logger.info("All systems ready!")
-        logger.info(f"Monitoring lights: {self.light_ids}")
-        logger.info(f"Checking for new songs every {self.update_interval}s")
+        logger.info("Monitoring lights: %s", self.light_ids)
+        logger.info("Checking for new songs every %ss", self.update_interval)
 
         try:
             while True:
+                started = time.monotonic()
+
                 # Get current track
                 track = self.spotify.get_current_track()
 
@@ -139,20 +174,21 @@ class SpottyHue:
                     if self.current_track_id is not None:
                         logger.info("Playback stopped")
                         self.current_track_id = None
-                    time.sleep(self.update_interval)
-                    continue
 
                 # Check if track changed
-                if track['id'] != self.current_track_id:
+                elif track['id'] != self.current_track_id:
                     self.current_track_id = track['id']
                     self.sync_colors_to_lights(track)
 
-                time.sleep(self.update_interval)
+                # The poll period includes the time this pass spent on work,
+                # so only sleep for whatever is left of it
+                elapsed = time.monotonic() - started
+                time.sleep(max(0.0, self._next_poll_delay(track) - elapsed))
 
         except KeyboardInterrupt:
             logger.info("SpottyHue stopped. Lights remain in current state.")
         except Exception as e:
-            logger.exception(f"Error in run loop: {e}")
+            logger.exception("Error in run loop: %s", e)
             raise
 
     def sync_once(self):
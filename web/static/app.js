@@ -16,6 +16,7 @@ let state = {
 };
 
 let pollInterval = null;
+let eventSource = null;
 
 // Initialization
 document.addEventListener('DOMContentLoaded', () => {
@@ -44,24 +45,26 @@ async function init() {
 async function loadStatus() {
     try {
         const res = await fetch(`${API_BASE}/status`);
-        const data = await res.json();
-        
-        state.active = data.active;
-        state.config = data.config;
-        state.currentTrack = data.current_track;
-        state.currentColors = data.current_colors || [];
-        
-        // Sync local selection with server config
-        if (state.config.light_ids) {
-            state.selectedLights = state.config.light_ids;
-        }
-
-        render();
+        applyStatus(await res.json());
     } catch (e) {
         console.error('Status load failed', e);
     }
 }
 
+function applyStatus(data) {
+    state.active = data.active;
+    state.config = data.config;
+    state.currentTrack = data.current_track;
+    state.currentColors = data.current_colors || [];
+
+    // Sync local selection with server config
+    if (state.config.light_ids) {
+        state.selectedLights = state.config.light_ids;
+    }
+
+    render();
+}
+
 async function loadLights() {
     try {
         const res = await fetch(`${API_BASE}/lights`);
@@ -104,7 +107,7 @@ async function toggleSync() {
         });
         
         const data = await res.json();
-        if (!res.ok) throw new Error(data.message);
+        if (!res.ok) throw new Error(data.error || data.message);
         
     } catch (e) {
         console.error('Toggle failed', e);
@@ -127,7 +130,7 @@ async function updateConfig() {
     document.getElementById('interval-val').textContent = interval + 's';
 
     try {
-        await fetch(`${API_BASE}/config`, {
+        const res = await fetch(`${API_BASE}/config`, {
             method: 'POST',
             headers: {'Content-Type': 'application/json'},
             body: JSON.stringify({
@@ -137,8 +140,16 @@ async function updateConfig() {
                 update_interval: interval
             })
         });
+
+        if (!res.ok) {
+            const data = await res.json();
+            throw new Error(data.error || data.message);
+        }
     } catch (e) {
         console.error('Config update failed', e);
+        alert('Failed to update settings: ' + e.message);
+        // Put the controls back to what the server is actually using
+        loadStatus();
     }
 }
 
@@ -376,6 +387,23 @@ function closeSettings() {
 }
 
 function startPolling() {
+    // Prefer server-pushed status updates; fall back to polling if the stream is unavailable
+    if (window.EventSource && !eventSource) {
+        eventSource = new EventSource(`${API_BASE}/events`);
+        eventSource.onmessage = (e) => applyStatus(JSON.parse(e.data));
+        eventSource.onerror = () => {
+            // The browser reconnects on its own unless the stream was refused outright
+            if (eventSource.readyState === EventSource.CLOSED) {
+                eventSource = null;
+                startStatusInterval();
+            }
+        };
+        return;
+    }
+    startStatusInterval();
+}
+
+function startStatusInterval() {
     if (pollInterval) clearInterval(pollInterval);
     pollInterval = setInterval(loadStatus, 2000);
 }
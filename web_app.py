@@ -5,16 +5,30 @@ Modern web UI for controlling Spotify to Hue light sync.
 """
 
 import os
+import atexit
+import functools
+import queue
+import random
+import hashlib
 import threading
 import time
 import secrets
 import logging
-from typing import Dict, List, Optional
-from flask import Flask, render_template, jsonify, request
-from flask_cors import CORS
+import requests
+from dataclasses import dataclass
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, FrozenSet, List, Optional, Tuple
+from flask import Blueprint, Flask, current_app, render_template, jsonify, request
+from flask.json.provider import DefaultJSONProvider
 from dotenv import load_dotenv
 from werkzeug.middleware.proxy_fix import ProxyFix
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from src import dns_cache
 from src.spotify_client import SpotifyClient
 from src.hue_controller import HueController
 from src.spottyhue import SpottyHue
@@ -26,18 +40,25 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-app = Flask(__name__,
-            template_folder='web/templates',
-            static_folder='web/static')
 
-# Production security settings
-app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', secrets.token_hex(32))
-app.config['SESSION_COOKIE_SECURE'] = os.getenv('SESSION_COOKIE_SECURE', 'False').lower() == 'true'
-app.config['SESSION_COOKIE_HTTPONLY'] = True
-app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'
-app.config['PERMANENT_SESSION_LIFETIME'] = 3600  # 1 hour
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max request size
-app.config['JSON_SORT_KEYS'] = False
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson's C encoder."""
+
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # Hand orjson's bytes straight to the response instead of round-tripping through str
+        obj = self._prepare_response_obj(args, kwargs)
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            option |= orjson.OPT_INDENT_2
+        return self._app.response_class(orjson.dumps(obj, default=self.default, option=option),
+                                        mimetype=self.mimetype)
+
 
 # Portal base path for reverse proxy routing (e.g., "/spottyhue")
 def normalize_base_path(value: Optional[str]) -> str:
@@ -48,26 +69,180 @@ def normalize_base_path(value: Optional[str]) -> str:
         return ''
     return '/' + trimmed.strip('/')
 
-BASE_PATH = normalize_base_path(os.getenv('PORTAL_BASE_PATH', ''))
 
-# Disable debug mode in production
-DEBUG_MODE = os.getenv('FLASK_DEBUG', 'False').lower() == 'true'
+def _env_flag(name: str) -> bool:
+    return os.getenv(name, 'False').lower() == 'true'
+
+
+@dataclass(frozen=True, slots=True)
+class AppConfig:
+    """Settings read from the environment once at startup."""
+    spotify_client_id: Optional[str]
+    spotify_client_secret: Optional[str]
+    spotify_redirect_uri: Optional[str]
+    hue_bridge_ip: Optional[str]
+    hue_username: Optional[str]
+    light_ids: Tuple[int, ...]
+    num_colors: int
+    update_interval: int
+    brightness: int
+    no_playback_timeout: int
+    secret_key: str
+    session_cookie_secure: bool
+    production: bool
+    allowed_origins: Tuple[str, ...]
+    behind_proxy: bool
+    base_path: str
+    debug: bool
+    host: str
+    port: int
+
+    @classmethod
+    def from_env(cls) -> 'AppConfig':
+        return cls(
+            spotify_client_id=os.getenv('SPOTIFY_CLIENT_ID'),
+            spotify_client_secret=os.getenv('SPOTIFY_CLIENT_SECRET'),
+            spotify_redirect_uri=os.getenv('SPOTIFY_REDIRECT_URI'),
+            hue_bridge_ip=os.getenv('HUE_BRIDGE_IP'),
+            hue_username=os.getenv('HUE_USERNAME'),
+            light_ids=tuple(int(x) for x in os.getenv('HUE_LIGHT_IDS', '11,12,13').split(',')),
+            num_colors=int(os.getenv('NUM_COLORS', '3')),
+            update_interval=int(os.getenv('UPDATE_INTERVAL', '2')),
+            brightness=int(os.getenv('BRIGHTNESS', '254')),
+            no_playback_timeout=int(os.getenv('NO_PLAYBACK_TIMEOUT', '1800')),
+            secret_key=os.getenv('SECRET_KEY', secrets.token_hex(32)),
+            session_cookie_secure=_env_flag('SESSION_COOKIE_SECURE'),
+            production=os.getenv('FLASK_ENV') == 'production',
+            allowed_origins=tuple(os.getenv('ALLOWED_ORIGINS', 'http://localhost:5001').split(',')),
+            behind_proxy=_env_flag('BEHIND_PROXY'),
+            base_path=normalize_base_path(os.getenv('PORTAL_BASE_PATH', '')),
+            # Disable debug mode in production
+            debug=_env_flag('FLASK_DEBUG'),
+            host=os.getenv('HOST', '0.0.0.0'),
+            port=int(os.getenv('PORT', 5001)),
+        )
+
+
+CFG = AppConfig.from_env()
+
+_clients_lock = threading.Lock()
+
+
+@functools.cache
+def _build_clients():
+    spotify = SpotifyClient(
+        client_id=CFG.spotify_client_id,
+        client_secret=CFG.spotify_client_secret,
+        redirect_uri=CFG.spotify_redirect_uri
+    )
+    hue = HueController(
+        bridge_ip=CFG.hue_bridge_ip,
+        username=CFG.hue_username
+    )
+    return spotify, hue
 
-# CORS configuration - restrict in production
-if os.getenv('FLASK_ENV') == 'production':
-    CORS(app, resources={
-        r"/api/*": {
-            "origins": os.getenv('ALLOWED_ORIGINS', 'http://localhost:5001').split(','),
-            "methods": ["GET", "POST"],
-            "allow_headers": ["Content-Type"]
-        }
-    })
-else:
-    CORS(app)
 
-# Handle proxy headers if behind reverse proxy
-if os.getenv('BEHIND_PROXY', 'False').lower() == 'true':
-    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=1, x_proto=1, x_host=1)
+def get_clients() -> Tuple[SpotifyClient, HueController]:
+    """Get the process-wide Spotify and Hue clients, building them on first use."""
+    # The lock makes sure concurrent first requests don't each build a pair
+    with _clients_lock:
+        return _build_clients()
+
+
+@atexit.register
+def close_clients():
+    """Close the shared clients' connection pools, if they were ever built."""
+    with _clients_lock:
+        if _build_clients.cache_info().currsize:
+            for client in _build_clients():
+                client.close()
+            _build_clients.cache_clear()
+
+
+class DaemonWorker:
+    """
+    One daemon thread running submitted callables in order, like ThreadPoolExecutor(max_workers=1).
+
+    ThreadPoolExecutor's threads are non-daemon and joined at interpreter exit, so a long-running
+    sync loop on one would keep the process from exiting.
+    """
+
+    def __init__(self, name: str):
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, fn, *args) -> Future:
+        future = Future()
+        self._queue.put((future, fn, args))
+        return future
+
+    def shutdown(self):
+        """Let the thread exit once queued work is done."""
+        self._queue.put(None)
+
+    def _run(self):
+        while (item := self._queue.get()) is not None:
+            future, fn, args = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = fn(*args)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+
+
+# Retry delays after a failed sync pass (seconds)
+SYNC_ERROR_BACKOFF_MIN = 0.5
+SYNC_ERROR_BACKOFF_MAX = 30.0
+SYNC_ERROR_JITTER = 0.25
+
+
+def _as_int(key: str, value, minimum: int, maximum: Optional[int] = None) -> int:
+    # bool is an int subclass, but true/false is never a sensible setting here
+    if isinstance(value, bool):
+        raise ValueError(f"{key} must be a number")
+    # int() would quietly truncate 2.7 to 2
+    if isinstance(value, float) and not value.is_integer():
+        raise ValueError(f"{key} must be a whole number")
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{key} must be a whole number") from None
+    if number < minimum or (maximum is not None and number > maximum):
+        limit = f"between {minimum} and {maximum}" if maximum is not None else f"at least {minimum}"
+        raise ValueError(f"{key} must be {limit}")
+    return number
+
+
+def validate_config(data: dict) -> dict:
+    """
+    Check and coerce config values from an API request.
+
+    Args:
+        data: Dict with any of light_ids, num_colors, update_interval, brightness
+
+    Returns:
+        Dict of the recognised keys with clean values
+
+    Raises:
+        ValueError: If a value is missing, malformed or out of range
+    """
+    config = {}
+    if 'light_ids' in data:
+        light_ids = data['light_ids']
+        if not isinstance(light_ids, (list, tuple)):
+            raise ValueError("light_ids must be a list")
+        config['light_ids'] = [_as_int('light_ids', light_id, 1) for light_id in light_ids]
+    if 'num_colors' in data:
+        config['num_colors'] = _as_int('num_colors', data['num_colors'], 1)
+    if 'update_interval' in data:
+        config['update_interval'] = _as_int('update_interval', data['update_interval'], 1)
+    if 'brightness' in data:
+        config['brightness'] = _as_int('brightness', data['brightness'], 0, 254)
+    return config
 
 
 class SyncManager:
@@ -75,301 +250,545 @@ class SyncManager:
 
     def __init__(self):
         self.active = False
-        self.thread: Optional[threading.Thread] = None
-        self.spotify_client: Optional[SpotifyClient] = None
-        self.hue_controller: Optional[HueController] = None
+        # One reusable worker thread runs the sync loop; _stop_event ends the current run
+        self._executor: Optional[DaemonWorker] = None
+        self._future: Optional[Future] = None
+        self._stop_event = threading.Event()
+        # Guards state shared between the sync thread and request handlers
+        self._lock = threading.Lock()
+        # Set to cut the loop's wait short (e.g. on stop)
+        self._wakeup = threading.Event()
+        # Notified (with _status_version bumped) whenever get_status() would change
+        self._status_changed = threading.Condition(self._lock)
+        self._status_version = 0
+        # Bumped on every config change; SpottyHue is only reconfigured when it moves
+        self._config_version = 0
+        self._applied_version = -1
         self.spottyhue_app: Optional[SpottyHue] = None
-        self.no_playback_timeout = int(os.getenv('NO_PLAYBACK_TIMEOUT', '1800'))
+        self.no_playback_timeout = CFG.no_playback_timeout
         self.last_playing_time: Optional[float] = None
         
         self.current_config = {
-            'light_ids': [int(x) for x in os.getenv('HUE_LIGHT_IDS', '11,12,13').split(',')],
-            'num_colors': int(os.getenv('NUM_COLORS', '3')),
-            'update_interval': int(os.getenv('UPDATE_INTERVAL', '2')),
-            'brightness': int(os.getenv('BRIGHTNESS', '254'))
+            'light_ids': list(CFG.light_ids),
+            'num_colors': CFG.num_colors,
+            'update_interval': CFG.update_interval,
+            'brightness': CFG.brightness
         }
         
         # State visible to API
         self.current_track_info = None
 
-    def initialize_clients(self):
-        """Initialize Spotify and Hue clients."""
-        if not self.spotify_client:
-            self.spotify_client = SpotifyClient(
-                client_id=os.getenv('SPOTIFY_CLIENT_ID'),
-                client_secret=os.getenv('SPOTIFY_CLIENT_SECRET'),
-                redirect_uri=os.getenv('SPOTIFY_REDIRECT_URI')
-            )
-
-        if not self.hue_controller:
-            self.hue_controller = HueController(
-                bridge_ip=os.getenv('HUE_BRIDGE_IP'),
-                username=os.getenv('HUE_USERNAME')
-            )
-
-        return self.spotify_client, self.hue_controller
+        # Short-lived copies of bridge responses: (expiry, data)
+        self._lights_cache = (0.0, None)
+        self._groups_cache = (0.0, None)
+
+    @property
+    def spotify_client(self) -> SpotifyClient:
+        return get_clients()[0]
+
+    @property
+    def hue_controller(self) -> HueController:
+        return get_clients()[1]
+
+    def cached_lights(self, ttl: float = 1.0) -> dict:
+        """Get lights from the bridge, reusing a response younger than ttl seconds."""
+        expiry, lights = self._lights_cache
+        if lights is None or time.monotonic() >= expiry:
+            lights = self.hue_controller.get_lights()
+            self._lights_cache = (time.monotonic() + ttl, lights)
+        return lights
+
+    def cached_groups(self, ttl: float = 1.0) -> dict:
+        """Get groups from the bridge, reusing a response younger than ttl seconds."""
+        expiry, groups = self._groups_cache
+        if groups is None or time.monotonic() >= expiry:
+            groups = self.hue_controller.get_groups()
+            self._groups_cache = (time.monotonic() + ttl, groups)
+        return groups
+
+    def invalidate_lights(self):
+        """Force the next cached_lights() call to query the bridge."""
+        self._lights_cache = (0.0, None)
+
+    def update_config(self, data: dict) -> dict:
+        """
+        Apply config values from an API request.
+
+        Args:
+            data: Dict with any of light_ids, num_colors, update_interval, brightness
+
+        Returns:
+            Copy of the resulting config
+
+        Raises:
+            ValueError: If any value is invalid; nothing is applied in that case
+        """
+        data = validate_config(data)
+        with self._lock:
+            self.current_config.update(data)
+            config = dict(self.current_config)
+            self._config_version += 1
+            self._notify_status_locked()
+
+        if 'light_ids' in data:
+            self.invalidate_lights()
+        # Interrupt the sync loop's wait so the new settings apply now
+        self._wakeup.set()
+        return config
 
     def get_spottyhue_app(self) -> SpottyHue:
-        """Create or return existing SpottyHue instance."""
-        self.initialize_clients()
-        
-        if not self.spottyhue_app:
-            self.spottyhue_app = SpottyHue(
-                spotify_client=self.spotify_client,
-                hue_controller=self.hue_controller,
-                light_ids=self.current_config['light_ids'],
-                num_colors=self.current_config['num_colors'],
-                update_interval=self.current_config['update_interval'],
-                brightness=self.current_config['brightness']
-            )
-        else:
-            # Update mutable config
-            self.spottyhue_app.light_ids = self.current_config['light_ids']
-            self.spottyhue_app.num_colors = min(self.current_config['num_colors'], len(self.current_config['light_ids']))
-            self.spottyhue_app.update_interval = self.current_config['update_interval']
-            self.spottyhue_app.brightness = self.current_config['brightness']
-            
+        """Create or return existing SpottyHue instance, with the current config applied."""
+        if self.spottyhue_app is None:
+            spotify, hue = get_clients()
+            self.spottyhue_app = SpottyHue(spotify_client=spotify, hue_controller=hue, light_ids=[])
+
+        if self._applied_version != self._config_version:
+            with self._lock:
+                config = dict(self.current_config)
+                version = self._config_version
+            self.spottyhue_app.update_config(config)
+            # A concurrent, newer change leaves the versions unequal, so it's applied next time
+            self._applied_version = version
         return self.spottyhue_app
 
     def start_sync(self):
-        """Start the sync process in a background thread."""
-        if self.active:
-            return False, "Sync already running"
+        """Start the sync process on the background worker."""
+        with self._lock:
+            if self.active:
+                return False, "Sync already running"
+            self.active = True
+            # A fresh event per run, created with active so a stop arriving mid-start sets this one.
+            # A previous loop still finishing a slow call keeps seeing its own stop.
+            stop_event = self._stop_event = threading.Event()
+            self._notify_status_locked()
 
         try:
             self.get_spottyhue_app() # Ensure app is ready
+            # Lights may have been changed elsewhere since the last run; resend everything
+            self.hue_controller.forget_state()
             self.last_playing_time = time.monotonic()
-            self.active = True
-            self.thread = threading.Thread(target=self._sync_loop, daemon=True)
-            self.thread.start()
+            if self._executor is None:
+                self._executor = DaemonWorker('spottyhue-sync')
+
+            with self._lock:
+                if stop_event.is_set():
+                    return False, "Sync stopped while starting"
+                future = self._future = self._executor.submit(self._sync_loop, stop_event)
+            # Outside the lock: the callback runs inline if the run has already finished
+            future.add_done_callback(self._on_loop_done)
             logger.info("Sync started")
             return True, "Sync started"
         except Exception as e:
+            with self._lock:
+                # Leave it alone if a stop (or a newer start) already took over
+                if self._stop_event is stop_event and not stop_event.is_set():
+                    self.active = False
+                    self._notify_status_locked()
             logger.exception("Failed to start sync")
             return False, str(e)
 
     def stop_sync(self):
-        """Stop the sync process."""
-        if not self.active:
+        """Stop the sync process, waiting briefly for the loop to finish its current pass."""
+        if not self._mark_stopped():
             return False, "Sync not running"
-        
-        self.active = False
-        self.current_track_info = None
-        self.last_playing_time = None
+
+        future = self._future
+        if future is not None:
+            try:
+                future.result(timeout=self.current_config['update_interval'] + 1)
+            except TimeoutError:
+                # Stuck in a slow Spotify/Hue call; it will exit once that returns
+                logger.warning("Sync loop still busy; not waiting for it")
+            except Exception:
+                # Already logged by _on_loop_done; stopping still succeeded
+                pass
+
         logger.info("Sync stopped")
         return True, "Sync stopped"
 
-    def _sync_loop(self):
-        """Background loop."""
+    def _on_loop_done(self, future: Future):
+        """Reset state if the current sync run died instead of being stopped."""
+        if future.cancelled() or future.exception() is None:
+            return
+        logger.error("Sync loop crashed", exc_info=future.exception())
+        # An older run finishing late must not stop the one that replaced it
+        if future is self._future:
+            self._mark_stopped()
+
+    def _mark_stopped(self) -> bool:
+        """
+        Clear sync state and signal the loop to exit, without waiting for it.
+
+        Returns:
+            False if sync wasn't running
+        """
+        with self._lock:
+            if not self.active:
+                return False
+
+            self.active = False
+            self.current_track_info = None
+            self.last_playing_time = None
+            self._notify_status_locked()
+            stop_event = self._stop_event
+
+        stop_event.set()
+        self._wakeup.set()
+        return True
+
+    def shutdown(self):
+        """Stop syncing and release the worker thread."""
+        self.stop_sync()
+        if self._executor is not None:
+            self._executor.shutdown()
+
+    def _sync_loop(self, stop_event: threading.Event):
+        """Background loop, run until stop_event is set."""
         current_track_id = None
+        error_delay = SYNC_ERROR_BACKOFF_MIN
         
         logger.info("Entering sync loop")
+        app_instance = self.spottyhue_app
         
-        while self.active:
+        while not stop_event.is_set():
+            # Clear before reading config so a change made from here on wakes the wait below
+            self._wakeup.clear()
             try:
-                # Use the spottyhue app methods
-                app_instance = self.get_spottyhue_app()
-                
-                track = self.spotify_client.get_current_track()
+                if self._applied_version != self._config_version:
+                    self.get_spottyhue_app()
+
+                # Let Spotify failures through so they back off instead of counting as "nothing playing"
+                track = self.spotify_client.get_current_track(raise_errors=True)
 
                 if track:
                     self.last_playing_time = time.monotonic()
 
                     if track['id'] != current_track_id:
-                        current_track_id = track['id']
-                        self.current_track_info = track
+                        with self._lock:
+                            self.current_track_info = track
                         
                         # This now handles color extraction, state update, and light update internally
                         app_instance.sync_colors_to_lights(track)
+                        # Only now: if the sync raised, the next pass retries this track
+                        current_track_id = track['id']
+                        self.invalidate_lights()
+                        # Publish once the new colors are in place
+                        with self._lock:
+                            self._notify_status_locked()
                         logger.info(f"Synced: {track['name']}")
                 else:
                     if self.current_track_info is not None:
-                        self.current_track_info = None
+                        with self._lock:
+                            self.current_track_info = None
+                            self._notify_status_locked()
 
                     if self.last_playing_time is None:
                         self.last_playing_time = time.monotonic()
 
                     if time.monotonic() - self.last_playing_time >= self.no_playback_timeout:
                         logger.info("No Spotify playback detected; stopping sync.")
-                        self.stop_sync()
+                        # Can't use stop_sync() here: it would wait on this very loop
+                        self._mark_stopped()
                         break
 
-                time.sleep(self.current_config['update_interval'])
+                error_delay = SYNC_ERROR_BACKOFF_MIN
+
+                if self._wakeup.wait(self.current_config['update_interval']):
+                    # Woken by a config change: re-apply colors with the new settings
+                    current_track_id = None
+                    self.hue_controller.forget_state()
 
             except Exception as e:
-                logger.error(f"Sync error: {e}")
-                time.sleep(5)
+                # requests' JSONDecodeError is a ValueError too, but means a misbehaving server
+                if isinstance(e, (KeyError, TypeError, ValueError)) and not isinstance(e, requests.RequestException):
+                    # Malformed data won't fix itself faster by backing off; retry on the normal schedule
+                    logger.error(f"Sync error (bad data): {e}")
+                    self._wakeup.wait(self.current_config['update_interval'])
+                    continue
+
+                # Likely transient (timeout, rate limit, bridge rebooting): back off, with jitter
+                delay = error_delay + random.uniform(0, SYNC_ERROR_JITTER)
+                logger.error(f"Sync error: {e}; retrying in {delay:.1f}s")
+                self._wakeup.wait(delay)
+                error_delay = min(error_delay * 2, SYNC_ERROR_BACKOFF_MAX)
+
+        logger.info("Sync loop exited")
 
     def get_status(self):
         """Get current status including colors from SpottyHue instance."""
-        colors = []
-        if self.spottyhue_app:
-            colors = self.spottyhue_app.current_colors
-            
-        return {
-            'active': self.active,
-            'config': self.current_config,
-            'current_track': self.current_track_info,
-            'current_colors': colors
-        }
-        
-    def get_light_color(self, light_id: int):
-        """Get current color for a light from SpottyHue instance."""
-        if self.spottyhue_app and light_id in self.spottyhue_app.light_colors:
-            return self.spottyhue_app.light_colors[light_id]
-        return None
-
-
-# Global SyncManager Instance
-sync_manager = SyncManager()
-
-
-# Security headers
-@app.after_request
-def set_security_headers(response):
-    """Add security headers to all responses."""
-    response.headers['X-Content-Type-Options'] = 'nosniff'
-    response.headers['X-Frame-Options'] = 'DENY'
-    response.headers['X-XSS-Protection'] = '1; mode=block'
-    response.headers['Strict-Transport-Security'] = 'max-age=31536000; includeSubDomains'
-    response.headers['Content-Security-Policy'] = (
-        "default-src 'self'; "
-        "script-src 'self' https://cdn.tailwindcss.com 'unsafe-inline'; "
-        "style-src 'self' https://fonts.googleapis.com 'unsafe-inline'; "
-        "font-src 'self' https://fonts.gstatic.com; "
-        "img-src 'self' data: https:; "
-        "connect-src 'self'"
-    )
-    return response
+        # Copy everything out under the lock so the response is a consistent snapshot
+        with self._lock:
+            app_instance = self.spottyhue_app
+            return {
+                'active': self.active,
+                'config': dict(self.current_config),
+                'current_track': self.current_track_info,
+                'current_colors': list(app_instance.current_colors) if app_instance else []
+            }
+
+    @property
+    def status_version(self) -> int:
+        return self._status_version
+
+    def _notify_status_locked(self):
+        """Wake get_status subscribers. Caller must hold self._lock."""
+        self._status_version += 1
+        self._status_changed.notify_all()
+
+    def wait_for_status_change(self, last_version: int, timeout: float) -> int:
+        """
+        Block until the status moves past last_version or the timeout passes.
+
+        Lets any number of API clients follow the sync loop's single Spotify poll
+        without polling anything themselves.
+
+        Returns:
+            The current status version (equal to last_version on timeout)
+        """
+        with self._status_changed:
+            self._status_changed.wait_for(lambda: self._status_version != last_version, timeout)
+            return self._status_version
+
+    def get_light_colors(self) -> Dict[int, tuple]:
+        """Get the current {light_id: (r, g, b)} mapping from SpottyHue instance."""
+        app_instance = self.spottyhue_app
+        return app_instance.light_colors if app_instance else {}
+
+
+api = Blueprint('spottyhue', __name__)
+
+
+def get_sync_manager() -> SyncManager:
+    """Get the SyncManager owned by the current app."""
+    return current_app.extensions['sync_manager']
+
+
+# Constant for the life of the process, so built once rather than per response
+SECURITY_HEADERS = (
+    ('X-Content-Type-Options', 'nosniff'),
+    ('X-Frame-Options', 'DENY'),
+    ('X-XSS-Protection', '1; mode=block'),
+    ('Strict-Transport-Security', 'max-age=31536000; includeSubDomains'),
+    ('Content-Security-Policy', '; '.join((
+        "default-src 'self'",
+        "script-src 'self' https://cdn.tailwindcss.com 'unsafe-inline'",
+        "style-src 'self' https://fonts.googleapis.com 'unsafe-inline'",
+        "font-src 'self' https://fonts.gstatic.com",
+        "img-src 'self' data: https:",
+        "connect-src 'self'",
+    ))),
+)
+
+
+# Preflight answers for cross-origin API calls
+CORS_ALLOW_METHODS = 'GET, POST'
+CORS_ALLOW_HEADERS = 'Content-Type'
+
+
+def make_response_headers_hook(allowed_origins: Optional[FrozenSet[str]]):
+    """
+    Build the single after_request hook that adds security and CORS headers.
+
+    Args:
+        allowed_origins: Origins allowed to call /api/*, or None to allow any origin on any route
+    """
+    def apply_response_headers(response):
+        headers = response.headers
+        for name, value in SECURITY_HEADERS:
+            headers[name] = value
+
+        origin = request.origin
+        if not origin:
+            return response
+        if allowed_origins is None:
+            headers['Access-Control-Allow-Origin'] = '*'
+        elif origin in allowed_origins and request.path.startswith('/api/'):
+            headers['Access-Control-Allow-Origin'] = origin
+            headers.add('Vary', 'Origin')
+        else:
+            return response
+
+        # Flask answers OPTIONS itself; just add what the browser's preflight asks for
+        if request.method == 'OPTIONS':
+            headers['Access-Control-Allow-Methods'] = CORS_ALLOW_METHODS
+            headers['Access-Control-Allow-Headers'] = CORS_ALLOW_HEADERS
+        return response
+
+    return apply_response_headers
+
+
+def conditional_json(payload):
+    """
+    Build a JSON response tagged with a content hash.
 
+    Clients that send a matching If-None-Match get an empty 304 instead.
+    """
+    response = jsonify(payload)
+    response.set_etag(hashlib.blake2b(response.get_data(), digest_size=16).hexdigest())
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
 
-@app.route('/')
+
+@api.route('/')
 def index():
     """Serve the main web interface."""
-    return render_template('index.html', base_path=BASE_PATH)
+    return render_template('index.html', base_path=CFG.base_path)
 
 
-@app.route('/api/status')
+@api.route('/api/status')
 def get_status():
     """Get current sync status."""
+    sync_manager = get_sync_manager()
     return jsonify(sync_manager.get_status())
 
 
-@app.route('/api/lights')
+# SSE comment sent when nothing changed, so proxies don't drop an idle stream
+EVENTS_KEEPALIVE_SECONDS = 15
+
+# Each open stream holds a server thread (16 in gunicorn.conf.py); leave the rest for other routes.
+# Past the cap clients get a 503 and the UI falls back to polling /api/status.
+MAX_EVENT_STREAMS = 8
+_event_streams = threading.BoundedSemaphore(MAX_EVENT_STREAMS)
+
+
+@api.route('/api/events')
+def status_events():
+    """Stream status updates as server-sent events."""
+    sync_manager = get_sync_manager()
+    dumps = current_app.json.dumps
+
+    if not _event_streams.acquire(blocking=False):
+        return jsonify({'error': 'Too many open event streams'}), 503
+
+    def stream():
+        # Read the version before the snapshot so a change in between is re-sent, not lost
+        version = sync_manager.status_version
+        yield f"data: {dumps(sync_manager.get_status())}\n\n"
+        while True:
+            latest = sync_manager.wait_for_status_change(version, EVENTS_KEEPALIVE_SECONDS)
+            if latest == version:
+                yield ": keepalive\n\n"
+                continue
+            version = latest
+            yield f"data: {dumps(sync_manager.get_status())}\n\n"
+
+    response = current_app.response_class(stream(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        # Stop nginx-style proxies from buffering the stream
+        'X-Accel-Buffering': 'no',
+    })
+    # Runs when the server closes the response, even if the stream was never started
+    response.call_on_close(_event_streams.release)
+    return response
+
+
+@api.route('/api/lights')
 def get_lights():
     """Get all available Hue lights."""
+    sync_manager = get_sync_manager()
     try:
-        spotify, hue = sync_manager.initialize_clients()
-        lights = hue.get_lights()
+        lights = sync_manager.cached_lights()
+
+        # Snapshot current colors once rather than looking them up per light
+        colors = sync_manager.get_light_colors()
 
-        # Format light data
+        # Format light data, adding the current color where we have one
         lights_list = []
         for light_id, light in lights.items():
+            state = light.get('state') or {}
+            light_type = light.get('type')
             light_data = {
-                'id': int(light_id),
+                'id': light_id,
                 'name': light.get('name'),
-                'type': light.get('type'),
-                'on': light.get('state', {}).get('on'),
-                'reachable': light.get('state', {}).get('reachable'),
-                'color_capable': 'color' in light.get('type', '').lower()
+                'type': light_type,
+                'on': state.get('on'),
+                'reachable': state.get('reachable'),
+                'color_capable': 'color' in (light_type or '').lower(),
             }
 
-            # Add current color if available
-            current_rgb = sync_manager.get_light_color(int(light_id))
-            if current_rgb:
-                light_data['current_color'] = current_rgb
+            rgb = colors.get(light_id)
+            if rgb:
+                light_data['current_color'] = rgb
 
             lights_list.append(light_data)
 
-        return jsonify(lights_list)
+        return conditional_json(lights_list)
     except Exception as e:
         logger.error(f"Error getting lights: {e}")
         return jsonify({'error': str(e)}), 500
 
 
-@app.route('/api/groups')
+@api.route('/api/groups')
 def get_groups():
     """Get all Hue groups (rooms/zones)."""
+    sync_manager = get_sync_manager()
     try:
-        spotify, hue = sync_manager.initialize_clients()
-        groups = hue.get_groups()
+        groups = sync_manager.cached_groups()
 
         # Format group data
         groups_list = []
         for group_id, group in groups.items():
             # Skip group 0 (all lights)
-            if group_id == '0':
+            if group_id == 0:
                 continue
 
             group_data = {
-                'id': int(group_id),
+                'id': group_id,
                 'name': group.get('name'),
                 'type': group.get('type'),
-                'lights': [int(light_id) for light_id in group.get('lights', [])],
+                'lights': group['lights'],
                 'class': group.get('class', ''),
             }
 
             groups_list.append(group_data)
 
-        return jsonify(groups_list)
+        return conditional_json(groups_list)
     except Exception as e:
         logger.error(f"Error getting groups: {e}")
         return jsonify({'error': str(e)}), 500
 
 
-@app.route('/api/start', methods=['POST'])
+@api.route('/api/start', methods=['POST'])
 def start_sync():
     """Start the Spotify sync."""
+    sync_manager = get_sync_manager()
     # Get config from request if provided
     data = request.get_json() or {}
-    
-    if 'light_ids' in data:
-        sync_manager.current_config['light_ids'] = data['light_ids']
-    if 'num_colors' in data:
-        sync_manager.current_config['num_colors'] = data['num_colors']
-    if 'update_interval' in data:
-        sync_manager.current_config['update_interval'] = data['update_interval']
-    if 'brightness' in data:
-        sync_manager.current_config['brightness'] = data['brightness']
+    try:
+        config = sync_manager.update_config(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
     success, message = sync_manager.start_sync()
     
     if success:
         return jsonify({
             'message': message,
-            'config': sync_manager.current_config
+            'config': config
         })
     else:
         # If it's already running, it's not a 500 error, but we return the message
         return jsonify({'message': message})
 
 
-@app.route('/api/stop', methods=['POST'])
+@api.route('/api/stop', methods=['POST'])
 def stop_sync():
     """Stop the Spotify sync."""
+    sync_manager = get_sync_manager()
     success, message = sync_manager.stop_sync()
     return jsonify({'message': message})
 
 
-@app.route('/api/config', methods=['POST'])
+@api.route('/api/config', methods=['POST'])
 def update_config():
     """Update sync configuration."""
-    data = request.get_json()
-    
-    config = sync_manager.current_config
-
-    if 'light_ids' in data:
-        config['light_ids'] = data['light_ids']
-
-    if 'num_colors' in data:
-        config['num_colors'] = data['num_colors']
-
-    if 'update_interval' in data:
-        config['update_interval'] = data['update_interval']
+    sync_manager = get_sync_manager()
+    data = request.get_json() or {}
+    try:
+        config = sync_manager.update_config(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
-    if 'brightness' in data:
-        config['brightness'] = data['brightness']
-        
     # If active, trigger update in app instance
     if sync_manager.active:
         sync_manager.get_spottyhue_app() # This triggers the update logic inside getter
@@ -380,51 +799,83 @@ def update_config():
     })
 
 
-@app.route('/api/test-connection')
+@api.route('/api/test-connection')
 def test_connection():
     """Test Spotify and Hue connections."""
+    sync_manager = get_sync_manager()
     try:
-        spotify, hue = sync_manager.initialize_clients()
+        spotify, hue = get_clients()
 
-        spotify_ok = spotify.test_connection()
-        hue_ok = hue.test_connection()
+        # Both checks are network-bound, so run them side by side
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            spotify_ok = pool.submit(spotify.test_connection)
+            hue_ok = pool.submit(hue.test_connection)
 
-        return jsonify({
-            'spotify': spotify_ok,
-            'hue': hue_ok
-        })
+            return jsonify({
+                'spotify': spotify_ok.result(),
+                'hue': hue_ok.result()
+            })
     except Exception as e:
         logger.error(f"Connection test failed: {e}")
         return jsonify({'error': str(e)}), 500
 
 
+def create_app() -> Flask:
+    """Build the Flask app along with its own SyncManager."""
+    # Cache name lookups for the Spotify API, artwork CDN and bridge
+    dns_cache.install()
+
+    app = Flask(__name__,
+                template_folder='web/templates',
+                static_folder='web/static')
+
+    # Production security settings
+    app.config['SECRET_KEY'] = CFG.secret_key
+    app.config['SESSION_COOKIE_SECURE'] = CFG.session_cookie_secure
+    app.config['SESSION_COOKIE_HTTPONLY'] = True
+    app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'
+    app.config['PERMANENT_SESSION_LIFETIME'] = 3600  # 1 hour
+    app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max request size
+    app.config['JSON_SORT_KEYS'] = False
+
+    # Fall back to Flask's stdlib encoder if orjson isn't installed
+    if orjson is not None:
+        app.json = OrjsonProvider(app)
+
+    # Security headers and CORS in one hook - origins restricted in production
+    allowed_origins = frozenset(CFG.allowed_origins) if CFG.production else None
+    app.after_request(make_response_headers_hook(allowed_origins))
+
+    # Handle proxy headers if behind reverse proxy
+    if CFG.behind_proxy:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=1, x_proto=1, x_host=1)
+
+    # One SyncManager per process; gunicorn runs a single worker so all requests share it
+    sync_manager = SyncManager()
+    app.extensions['sync_manager'] = sync_manager
+    atexit.register(sync_manager.shutdown)
+
+    app.register_blueprint(api)
+    return app
+
+
 if __name__ == '__main__':
+    app = create_app()
+
     print("=" * 60)
     print("SpottyHue Web Interface")
     print("=" * 60)
 
-    if DEBUG_MODE:
+    if CFG.debug:
         print("\n⚠️  WARNING: Running in DEBUG mode - not suitable for production!")
     else:
-        print("\n✓ Running in production mode")
+        print("\n⚠️  Flask development server - for production run: gunicorn -c gunicorn.conf.py")
 
-    port = int(os.getenv('PORT', 5001))
-    host = os.getenv('HOST', '0.0.0.0')
+    port = CFG.port
+    host = CFG.host
 
     print(f"\nStarting web server on {host}:{port}...")
     print(f"Open your browser to: http://localhost:{port}")
     print("\nPress Ctrl+C to stop\n")
 
-    # Production: Use waitress or gunicorn
-    # Development: Use Flask dev server
-    if not DEBUG_MODE and os.getenv('USE_WAITRESS', 'False').lower() == 'true':
-        try:
-            from waitress import serve
-            print("Using Waitress production server")
-            serve(app, host=host, port=port, threads=4)
-        except ImportError:
-            print("⚠️  Waitress not installed. Install with: pip install waitress")
-            print("Falling back to Flask development server (not recommended for production)")
-            app.run(debug=False, host=host, port=port, threaded=True)
-    else:
-        app.run(debug=DEBUG_MODE, host=host, port=port, threaded=True)
+    app.run(debug=CFG.debug, host=host, port=port, threaded=True)